@@ -1,6 +1,182 @@
 import streamlit as st
 import sys
+import time
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import requests
+import yfinance as yf
+
+SPARK_URL = "https://query1.finance.yahoo.com/v8/finance/spark"
+SPARK_BATCH_SIZE = 20  # max symbols per spark request
+OPTION_COLUMNS = ['strike', 'lastPrice', 'bid', 'ask', 'volume', 'impliedVolatility']
+PROFILE_FIELDS = ('longName', 'marketCap', 'sector', 'industry', 'longBusinessSummary')
+
+# Cached market data fetchers (short TTLs so prices stay fresh)
+@st.cache_data(ttl=60, max_entries=128, show_spinner=False)
+def fetch_history(symbol, period):
+    """Fetch OHLCV history for a symbol."""
+    return yf.Ticker(symbol).history(period=period)
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def fetch_info(symbol):
+    """Fetch a symbol's info in one request, keeping only the PROFILE_FIELDS shown."""
+    info = yf.Ticker(symbol).info
+    return {key: info.get(key) for key in PROFILE_FIELDS}
+
+@st.cache_data(ttl=60, max_entries=128, show_spinner=False)
+def fetch_quote(symbol, fields):
+    """Fetch only the requested fast_info fields (each one may cost a request)."""
+    fast_info = yf.Ticker(symbol).fast_info
+    return {key: fast_info[key] for key in fields}
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def fetch_expirations(symbol):
+    """Fetch available option expiration dates for a symbol."""
+    return yf.Ticker(symbol).options
+
+@st.cache_data(ttl=60, max_entries=128, show_spinner=False)
+def fetch_option_chain(symbol, expiration):
+    """Fetch the (calls, puts, underlying quote) option chain for one expiration."""
+    opt = yf.Ticker(symbol).option_chain(expiration)
+    return opt.calls, opt.puts, opt.underlying or {}
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def fetch_many(symbols, period):
+    """Fetch OHLCV history for several symbols concurrently."""
+    def history(symbol):
+        return yf.Ticker(symbol).history(period=period)
+    
+    with ThreadPoolExecutor(max_workers=min(16, len(symbols))) as executor:
+        return dict(zip(symbols, executor.map(history, symbols)))
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def fetch_spark(symbols, range_="1mo", interval="1d"):
+    """Fetch close series for many symbols, 20 per spark request."""
+    closes = {}
+    for start in range(0, len(symbols), SPARK_BATCH_SIZE):
+        response = requests.get(
+            SPARK_URL,
+            params={
+                "symbols": ",".join(symbols[start:start + SPARK_BATCH_SIZE]),
+                "range": range_,
+                "interval": interval,
+                "indicators": "close"
+            },
+            headers={"User-Agent": "Mozilla/5.0"},
+            timeout=5
+        )
+        response.raise_for_status()
+        closes.update(parse_spark(response.json()))
+    
+    return pd.DataFrame(closes)
+
+def parse_spark(payload):
+    """Map a v8 spark payload ({symbol: {timestamp, close, ...}}) to close Series."""
+    closes = {}
+    for symbol, chart in payload.items():
+        # Symbols with no bars in the range come back without timestamps
+        if not chart or not chart.get("timestamp"):
+            continue
+        closes[symbol] = pd.Series(
+            chart["close"],
+            index=pd.to_datetime(chart["timestamp"], unit="s"),
+            dtype=float
+        )
+    return closes
+
+def price_metrics(data):
+    """Format the price, change and volume metric strings for a history frame."""
+    close = data['Close'].to_numpy()
+    volume = data['Volume'].to_numpy()
+    change = close[-1] - close[-2]
+    change_pct = (change / close[-2]) * 100
+    return {
+        "price": f"${close[-1]:.2f}",
+        "change": f"{change:.2f} ({change_pct:.1f}%)",
+        "volume": f"{volume[-1]:,.0f}"
+    }
+
+def history_snapshot(symbol, period):
+    """Fetch history plus its preformatted metric strings (None if empty)."""
+    data = fetch_history(symbol, period)
+    return data, (price_metrics(data) if not data.empty else None)
+
+def session_memo(slot, key, loader, ttl=60):
+    """Return loader() for key, reusing this session's last result while fresh."""
+    entry = st.session_state.get(slot)
+    if entry is None or entry[0] != key or time.monotonic() - entry[1] > ttl:
+        entry = (key, time.monotonic(), loader())
+        st.session_state[slot] = entry
+    return entry[2]
+
+# Technical indicators
+def rolling_mean(values, window):
+    """Trailing simple moving average, NaN until the window is full."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        csum = np.cumsum(values, dtype=np.float64)
+        out[window - 1:] = csum[window - 1:]
+        out[window:] -= csum[:-window]
+        out[window - 1:] /= window
+    return out
+
+def compute_indicators(close):
+    """Compute SMA 20 and SMA 50 arrays and the latest RSI 14 from close prices."""
+    sma20 = rolling_mean(close, 20)
+    sma50 = rolling_mean(close, 50)
+    
+    # Wilder's RSI: exponential smoothing of gains/losses with alpha = 1/14
+    delta = np.diff(close)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain = pd.Series(gain).ewm(alpha=1/14, adjust=False, min_periods=14).mean().to_numpy()
+    avg_loss = pd.Series(loss).ewm(alpha=1/14, adjust=False, min_periods=14).mean().to_numpy()
+    rsi = 100 - 100 / (1 + avg_gain / np.maximum(avg_loss, 1e-12))
+    
+    return sma20, sma50, (rsi[-1] if len(rsi) else np.nan)
+
+@st.cache_data(persist="disk", max_entries=256, show_spinner=False)
+def cached_indicators(close_bytes):
+    """Disk-persisted compute_indicators keyed on raw float32 close-price bytes."""
+    return compute_indicators(np.frombuffer(close_bytes, dtype=np.float32))
+
+def data_signature(data):
+    """Cheap identity for a history frame: row count, first/last bar and last close."""
+    return (len(data), str(data.index[0]), str(data.index[-1]), float(data['Close'].to_numpy()[-1]))
+
+@st.cache_resource(ttl=60, max_entries=64, show_spinner=False)
+def candlestick_figure(title, sig, _data, _overlays=(), layout=None):
+    """Build a candlestick figure, memoized on its title and data signature.
+    
+    _overlays is a sequence of (name, values, color) lines derived from
+    _data, so both are excluded from hashing and covered by sig. The
+    figure is shared across reruns uncopied, so callers must not mutate it.
+    """
+    fig = go.Figure(data=go.Candlestick(
+        x=_data.index,
+        open=_data['Open'],
+        high=_data['High'],
+        low=_data['Low'],
+        close=_data['Close'],
+        name="Price"
+    ))
+    
+    # WebGL overlays stay responsive on long intraday series
+    for name, values, color in _overlays:
+        fig.add_trace(go.Scattergl(x=_data.index, y=values, name=name, line=dict(color=color)))
+    
+    fig.update_layout(title=title, **(layout or {}))
+    return fig
+
+@st.cache_resource
+def get_analyzer():
+    """Build the chart analyzer once per process."""
+    from chart_analyzer import ChartAnalyzer
+    return ChartAnalyzer()
 
 # Simple page routing without complex imports
 def main():
@@ -59,13 +235,11 @@ def home_page():
 
 def chart_analysis_page():
     """New chart analysis page for uploaded images."""
-    from chart_analyzer import ChartAnalyzer
-    
     st.header("📸 Chart Analysis")
     st.write("Upload a futures chart screenshot and get AI-powered trading recommendations!")
     
     # Initialize analyzer
-    analyzer = ChartAnalyzer()
+    analyzer = get_analyzer()
     
     # File uploader
     uploaded_file = st.file_uploader(
@@ -165,81 +339,125 @@ def chart_analysis_page():
         - Avoid charts with too many overlapping indicators
         """)
 
-def stocks_page():
-    import yfinance as yf
-    import plotly.graph_objects as go
-    import pandas as pd
-    import numpy as np
+def render_price_metrics(metrics, price_col, volume_col):
+    """Render preformatted Current Price and Volume metrics into two columns."""
+    with price_col:
+        st.metric("Current Price", metrics["price"], metrics["change"])
+    with volume_col:
+        st.metric("Volume", metrics["volume"])
+
+def render_batch(results, labels=None):
+    """Render one tab per symbol with price metrics and a candlestick chart."""
+    labels = labels or {}
+    symbols = list(results)
+    tabs = st.tabs([labels.get(symbol, symbol) for symbol in symbols])
+    
+    for tab, symbol in zip(tabs, symbols):
+        data = results[symbol]
+        with tab:
+            if data.empty:
+                st.warning(f"No data available for {symbol}")
+                continue
+            
+            # A one-bar series (e.g. period="1d") has no prior close to diff against
+            if len(data) < 2:
+                st.metric("Current Price", "N/A")
+            else:
+                render_price_metrics(price_metrics(data), *st.columns(2))
+            
+            fig = candlestick_figure(
+                f"{symbol} Price Chart",
+                data_signature(data),
+                data,
+                layout=dict(height=400)
+            )
+            
+            st.plotly_chart(fig, use_container_width=True)
+
+def render_spark_strip(closes, per_row=5):
+    """Render a compact price/change metric for each spark close series."""
+    symbols = list(closes.columns)
     
+    for start in range(0, len(symbols), per_row):
+        cols = st.columns(per_row)
+        for col, symbol in zip(cols, symbols[start:start + per_row]):
+            close = closes[symbol].dropna().to_numpy()
+            with col:
+                if len(close) < 2:
+                    st.metric(symbol, "N/A")
+                    continue
+                
+                latest_price = close[-1]
+                change = close[-1] - close[-2]
+                change_pct = (change / close[-2]) * 100
+                st.metric(symbol, f"${latest_price:.2f}", f"{change:.2f} ({change_pct:.1f}%)")
+
+def parse_symbols(text):
+    """Split comma-separated input into unique upper-case symbols."""
+    return tuple(dict.fromkeys(s.strip().upper() for s in text.split(",") if s.strip()))
+
+def stocks_page():
     st.header("📈 Stock Analysis")
     
     # Sidebar controls
     st.sidebar.subheader("Stock Selection")
     symbol = st.sidebar.text_input("Enter Symbol", value="AAPL").upper()
     period = st.sidebar.selectbox("Time Period", ["1d", "5d", "1mo", "3mo", "1y"], index=2)
+    show_profile = st.sidebar.checkbox("Show company profile", value=False)
     
     if st.sidebar.button("Analyze Stock", type="primary"):
         try:
             with st.spinner(f"Fetching data for {symbol}..."):
-                # Fetch stock data
-                ticker = yf.Ticker(symbol)
-                data = ticker.history(period=period)
-                info = ticker.info
+                # Fetch stock data; one info request covers name, market cap and profile
+                data, metrics, info = session_memo(
+                    "stocks",
+                    (symbol, period),
+                    lambda: (*history_snapshot(symbol, period), fetch_info(symbol))
+                )
             
             if not data.empty:
                 # Display basic info
-                st.subheader(f"{symbol} - {info.get('longName', symbol)}")
+                long_name = info['longName']
+                st.subheader(f"{symbol} - {long_name}" if long_name else symbol)
+                
+                if show_profile:
+                    with st.expander("Company Profile"):
+                        st.write(f"**Sector:** {info['sector'] or 'N/A'}")
+                        st.write(f"**Industry:** {info['industry'] or 'N/A'}")
+                        st.write(info['longBusinessSummary'] or '')
                 
                 # Metrics
-                latest_price = data['Close'].iloc[-1]
-                change = data['Close'].iloc[-1] - data['Close'].iloc[-2]
-                change_pct = (change / data['Close'].iloc[-2]) * 100
+                close = data['Close'].to_numpy()
                 
                 col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Current Price", f"${latest_price:.2f}", f"{change:.2f} ({change_pct:.1f}%)")
-                with col2:
-                    st.metric("Volume", f"{data['Volume'].iloc[-1]:,.0f}")
+                render_price_metrics(metrics, col1, col2)
                 with col3:
-                    st.metric("Market Cap", info.get('marketCap', 'N/A'))
-                
-                # Price chart
-                fig = go.Figure(data=go.Candlestick(
-                    x=data.index,
-                    open=data['Open'],
-                    high=data['High'],
-                    low=data['Low'],
-                    close=data['Close'],
-                    name="Price"
-                ))
+                    market_cap = info['marketCap']
+                    st.metric("Market Cap", f"${market_cap:,.0f}" if market_cap else "N/A")
                 
                 # Add moving averages
-                data['SMA_20'] = data['Close'].rolling(window=20).mean()
-                data['SMA_50'] = data['Close'].rolling(window=50).mean()
-                
-                fig.add_trace(go.Scatter(x=data.index, y=data['SMA_20'], name='SMA 20', line=dict(color='blue')))
-                fig.add_trace(go.Scatter(x=data.index, y=data['SMA_50'], name='SMA 50', line=dict(color='orange')))
+                # float32 is ample for 2-decimal quotes and halves the bytes hashed/moved
+                sma20, sma50, current_rsi = cached_indicators(close.astype(np.float32).tobytes())
                 
-                fig.update_layout(
-                    title=f"{symbol} Price Chart",
-                    yaxis_title="Price ($)",
-                    xaxis_title="Date",
-                    height=500
+                # Price chart
+                fig = candlestick_figure(
+                    f"{symbol} Price Chart",
+                    data_signature(data),
+                    data,
+                    [('SMA 20', sma20, 'blue'), ('SMA 50', sma50, 'orange')],
+                    layout=dict(
+                        yaxis_title="Price ($)",
+                        xaxis_title="Date",
+                        height=500,
+                        uirevision="stocks"
+                    )
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
                 
-                # Simple RSI calculation
-                delta = data['Close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                rs = gain / loss
-                rsi = 100 - (100 / (1 + rs))
-                
                 col1, col2 = st.columns(2)
                 with col1:
                     st.subheader("Technical Indicators")
-                    current_rsi = rsi.iloc[-1]
                     st.metric("RSI (14)", f"{current_rsi:.1f}")
                     
                     if current_rsi > 70:
@@ -251,9 +469,9 @@ def stocks_page():
                 
                 with col2:
                     st.subheader("Moving Average Signal")
-                    current_price = data['Close'].iloc[-1]
-                    sma_20 = data['SMA_20'].iloc[-1]
-                    sma_50 = data['SMA_50'].iloc[-1]
+                    current_price = close[-1]
+                    sma_20 = sma20[-1]
+                    sma_50 = sma50[-1]
                     
                     if current_price > sma_20 > sma_50:
                         st.success("🟢 Strong Bullish Trend")
@@ -266,11 +484,32 @@ def stocks_page():
             
         except Exception as e:
             st.error(f"Error fetching data: {str(e)}")
+    
+    st.sidebar.subheader("Watchlist")
+    watchlist = st.sidebar.text_input("Symbols (comma-separated)", value="AAPL, MSFT, GOOGL")
+    
+    if st.sidebar.button("Analyze Watchlist"):
+        symbols = parse_symbols(watchlist)
+        if symbols:
+            try:
+                with st.spinner(f"Fetching data for {len(symbols)} symbols..."):
+                    # Intraday points for 1d so there is a change to show
+                    interval = "5m" if period == "1d" else "1d"
+                    closes = fetch_spark(symbols, period, interval)
+                
+                if closes.empty:
+                    st.warning("No watchlist data available")
+                else:
+                    render_spark_strip(closes)
+                    st.line_chart(closes)
+                    st.caption("Use **Analyze Stock** for the full chart and indicators of a single symbol.")
+                
+            except Exception as e:
+                st.error(f"Error fetching data: {str(e)}")
+        else:
+            st.warning("Enter at least one symbol")
 
 def options_page():
-    import yfinance as yf
-    import pandas as pd
-    
     st.header("⚡ Options Analysis")
     
     st.sidebar.subheader("Options Selection")
@@ -279,39 +518,43 @@ def options_page():
     if st.sidebar.button("Load Options", type="primary"):
         try:
             with st.spinner(f"Loading options for {symbol}..."):
-                ticker = yf.Ticker(symbol)
-                expirations = ticker.options
+                expirations = session_memo("options", symbol, lambda: fetch_expirations(symbol), ttl=300)
                 
                 if expirations:
                     expiration = st.selectbox("Select Expiration", expirations)
                     
-                    opt = ticker.option_chain(expiration)
-                    calls = opt.calls
-                    puts = opt.puts
+                    calls, puts, underlying = session_memo(
+                        "option_chain",
+                        (symbol, expiration),
+                        lambda: fetch_option_chain(symbol, expiration)
+                    )
                     
-                    # Get current price
-                    current_price = ticker.history(period="1d")['Close'].iloc[-1]
+                    # Get current price (the chain's own underlying quote, else fast_info)
+                    current_price = underlying.get('regularMarketPrice')
+                    if current_price is None:
+                        current_price = fetch_quote(symbol, ("last_price",))['last_price']
                     
                     st.subheader(f"{symbol} Options Chain - {expiration}")
-                    st.info(f"Current Stock Price: ${current_price:.2f}")
+                    if current_price:
+                        st.info(f"Current Stock Price: ${current_price:.2f}")
+                    
+                    # Simple analytics: one groupby pass over both sides' volume
+                    # (sum skips the NaNs Yahoo reports for untraded strikes)
+                    volumes = pd.concat([calls['volume'], puts['volume']], keys=['C', 'P'])
+                    totals = volumes.groupby(level=0, sort=False).sum()
+                    total_call_volume = int(totals.get('C', 0))
+                    total_put_volume = int(totals.get('P', 0))
                     
                     col1, col2 = st.columns(2)
                     
                     with col1:
                         st.subheader("📞 Calls")
-                        calls_display = calls[['strike', 'lastPrice', 'bid', 'ask', 'volume', 'impliedVolatility']].head(10)
-                        st.dataframe(calls_display)
-                        
-                        # Simple analytics
-                        total_call_volume = calls['volume'].sum()
+                        st.dataframe(calls.head(10)[OPTION_COLUMNS])
                         st.metric("Total Call Volume", f"{total_call_volume:,}")
                     
                     with col2:
                         st.subheader("📉 Puts")
-                        puts_display = puts[['strike', 'lastPrice', 'bid', 'ask', 'volume', 'impliedVolatility']].head(10)
-                        st.dataframe(puts_display)
-                        
-                        total_put_volume = puts['volume'].sum()
+                        st.dataframe(puts.head(10)[OPTION_COLUMNS])
                         st.metric("Total Put Volume", f"{total_put_volume:,}")
                     
                     # Put/Call ratio
@@ -325,9 +568,6 @@ def options_page():
             st.error(f"Error loading options: {str(e)}")
 
 def futures_page():
-    import yfinance as yf
-    import plotly.graph_objects as go
-    
     st.header("🚀 Futures Analysis")
     
     # Common futures contracts
@@ -352,41 +592,42 @@ def futures_page():
     if st.sidebar.button("Analyze Futures", type="primary"):
         try:
             with st.spinner(f"Loading {futures_symbols[selected]}..."):
-                ticker = yf.Ticker(selected)
-                data = ticker.history(period=period)
+                data, metrics = session_memo("futures", (selected, period), lambda: history_snapshot(selected, period))
             
             if not data.empty:
                 st.subheader(f"{futures_symbols[selected]} ({selected})")
                 
                 # Basic metrics
-                latest_price = data['Close'].iloc[-1]
-                change = data['Close'].iloc[-1] - data['Close'].iloc[-2]
-                change_pct = (change / data['Close'].iloc[-2]) * 100
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric("Current Price", f"${latest_price:.2f}", f"{change:.2f} ({change_pct:.1f}%)")
-                with col2:
-                    st.metric("Volume", f"{data['Volume'].iloc[-1]:,.0f}")
+                render_price_metrics(metrics, *st.columns(2))
                 
                 # Chart
-                fig = go.Figure(data=go.Candlestick(
-                    x=data.index,
-                    open=data['Open'],
-                    high=data['High'],
-                    low=data['Low'],
-                    close=data['Close']
-                ))
-                
-                fig.update_layout(
-                    title=f"{selected} Futures Chart",
-                    height=500
+                fig = candlestick_figure(
+                    f"{selected} Futures Chart",
+                    data_signature(data),
+                    data,
+                    layout=dict(height=500)
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
                 
         except Exception as e:
             st.error(f"Error loading futures data: {str(e)}")
+    
+    compare = st.sidebar.multiselect(
+        "Compare Contracts",
+        options=list(futures_symbols.keys()),
+        format_func=lambda x: f"{x} - {futures_symbols[x]}"
+    )
+    
+    if st.sidebar.button("Compare Futures", disabled=not compare):
+        try:
+            with st.spinner(f"Loading {len(compare)} contracts..."):
+                results = fetch_many(tuple(compare), period)
+            
+            render_batch(results, futures_symbols)
+            
+        except Exception as e:
+            st.error(f"Error loading futures data: {str(e)}")
 
 if __name__ == "__main__":
     main()
@@ -6,8 +6,246 @@ from PIL import Image, ImageEnhance, ImageFilter
 import cv2
 import requests
 import base64
+import hashlib
+from bisect import bisect_right
+from enum import IntEnum, IntFlag
 from io import BytesIO
 
+# Add scipy to requirements if not present
+try:
+    from scipy.signal import find_peaks
+except ImportError:
+    def find_peaks(data, height=None):
+        """Simple peak detection fallback (strict local maxima)."""
+        data = np.asarray(data)
+        inner = data[1:-1]
+        is_peak = (inner > data[:-2]) & (inner > data[2:])
+        if height is not None:
+            is_peak &= inner >= height
+        return np.flatnonzero(is_peak) + 1, {}
+
+# Formats accepted by the uploader; PIL skips probing any other plugin
+CHART_FORMATS = ("JPEG", "PNG")
+
+# libjpeg DCT-scaled decodes, largest reduction first
+JPEG_REDUCED_DECODES = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2)
+)
+
+# Analysis runs on a copy downscaled to this reference width; the
+# morphology kernel and strength thresholds are calibrated for it
+ANALYSIS_WIDTH = 800
+
+# Charts smaller or flatter than this carry too little detail to analyze
+MIN_CHART_PIXELS = 50 * 50
+MIN_GRAY_STD = 5.0
+
+# Line segments within this many degrees of 0/90 count as horizontal/vertical
+LINE_ANGLE_TOLERANCE = 10
+
+# Pattern sides must bound the same stretch of chart for this many pixels
+PATTERN_MIN_OVERLAP = 40
+
+# A flat triangle side may extend at most this many times past that stretch
+FLAT_SIDE_SLACK = 1.5
+
+# Rectangle sides may fall this many pixels short of the bounds they close
+RECTANGLE_EDGE_SLACK = 10
+
+# Segments spanning more of the chart than this are frame, axis or grid lines
+FRAME_SPAN_FRACTION = 0.6
+
+# Longest segments kept per candidate set, bounding the pairwise broadcasts
+MAX_PATTERN_SEGMENTS = 64
+
+class Trend(IntEnum):
+    """Trend direction; the sign is the direction, magnitude >= 2 is a trend."""
+    STRONG_DOWNTREND = -3
+    DOWNTREND = -2
+    NEUTRAL = 0
+    SIDEWAYS = 1
+    UPTREND = 2
+    STRONG_UPTREND = 3
+
+class PatternFlags(IntFlag):
+    """Bitmask of detected chart patterns."""
+    NONE = 0
+    SUPPORT_RESISTANCE = 1
+    TRIANGLE = 2
+    RECTANGLE = 4
+
+# User-facing pattern names, in display order
+_PATTERN_NAMES = {
+    PatternFlags.SUPPORT_RESISTANCE: "Strong Support/Resistance Levels",
+    PatternFlags.TRIANGLE: "Triangle Pattern",
+    PatternFlags.RECTANGLE: "Rectangle/Channel Pattern"
+}
+
+# Signal scoring tables: trend/pattern -> (score, reasoning)
+_TREND_SCORES = {
+    Trend.STRONG_UPTREND: (40, "Strong uptrend detected"),
+    Trend.UPTREND: (25, "Uptrend detected"),
+    Trend.STRONG_DOWNTREND: (-40, "Strong downtrend detected"),
+    Trend.DOWNTREND: (-25, "Downtrend detected")
+}
+_PATTERN_SCORES = {
+    PatternFlags.SUPPORT_RESISTANCE: (15, "Strong support/resistance levels identified"),
+    PatternFlags.TRIANGLE: (10, "Triangle pattern suggests breakout potential")
+}
+
+# Score bands: bisect_right(_SIGNAL_CUTOFFS, score) -> (signal, base confidence, cap)
+_SIGNAL_CUTOFFS = (-29, -14, 15, 30)
+_SIGNAL_BANDS = (
+    ("STRONG SELL", 60, 90),
+    ("SELL", 50, 75),
+    ("HOLD", 40, 100),
+    ("BUY", 50, 75),
+    ("STRONG BUY", 60, 90)
+)
+
+def _mask_slope(mask):
+    """Least-squares slope through a boolean mask's pixels, or None if undefined.
+    
+    Works from the mask's image moments in one pass, with no float copy or
+    coordinate arrays. Masks with 10 or fewer pixels have no slope.
+    """
+    m = cv2.moments(mask.view(np.uint8), binaryImage=True)
+    if m["m00"] <= 10 or m["mu20"] <= 0:
+        return None
+    return m["mu11"] / m["mu20"]
+
+def _strongest_peaks(projection, k):
+    """Return (indices, values) of the k strongest peaks, strongest first."""
+    peaks, _ = find_peaks(projection, height=projection.max()*0.3)
+    strengths = projection[peaks]
+    
+    # O(n) partition, then rank just the k survivors
+    if len(peaks) > k:
+        top = np.argpartition(-strengths, k)[:k]
+        peaks, strengths = peaks[top], strengths[top]
+    ranked = np.argsort(-strengths, kind="stable")
+    return peaks[ranked], strengths[ranked]
+
+def _default_results():
+    """Neutral HOLD result that each analysis step fills in."""
+    return {
+        "overall_signal": "HOLD",
+        "confidence": 0,
+        "trend": Trend.NEUTRAL,
+        "trend_direction": "NEUTRAL",
+        "pattern_flags": PatternFlags.NONE,
+        "support_resistance": [],
+        "patterns_detected": [],
+        "technical_analysis": {},
+        "recommendation": ""
+    }
+
+def _longest_indices(segments, mask, k):
+    """Indices of the k longest (n, 4) x1, y1, x2, y2 segments selected by mask."""
+    index = np.flatnonzero(mask)
+    if len(index) <= k:
+        return index
+    chosen = segments[index]
+    lengths = np.hypot(chosen[:, 2] - chosen[:, 0], chosen[:, 3] - chosen[:, 1])
+    return index[np.argpartition(-lengths, k)[:k]]
+
+def _converging_sides(segments, upper_mask, lower_mask, width):
+    """Count segments that pair into a converging triangle boundary.
+    
+    segments is an (n, 4) x1, y1, x2, y2 array in image coordinates
+    (y down); the masks select upper and lower side candidates, which may
+    overlap (flat sides are both), but each segment counts once. A pair
+    counts when both segments span a shared stretch of the chart, the
+    lower side stays below the upper side there, the gap between them
+    narrows left to right, and the two lines meet ahead of that stretch but
+    still inside the chart. A flat side must not reach far beyond the
+    stretch it bounds.
+    """
+    upper_index = _longest_indices(segments, upper_mask, MAX_PATTERN_SEGMENTS)
+    lower_index = _longest_indices(segments, lower_mask, MAX_PATTERN_SEGMENTS)
+    if not len(upper_index) or not len(lower_index):
+        return 0
+    flat_slope = np.tan(np.radians(LINE_ANGLE_TOLERANCE))
+    
+    def as_lines(segments):
+        # Left/right x extent plus y = m*x + c (no vertical segments here)
+        x1, y1, x2, y2 = segments.T
+        slope = (y2 - y1) / (x2 - x1)
+        return np.minimum(x1, x2), np.maximum(x1, x2), slope, y1 - slope * x1
+    
+    u_left, u_right, u_slope, u_icept = (a[:, None] for a in as_lines(segments[upper_index]))
+    l_left, l_right, l_slope, l_icept = (a[None, :] for a in as_lines(segments[lower_index]))
+    
+    start = np.maximum(u_left, l_left)
+    end = np.minimum(u_right, l_right)
+    gap_start = (l_slope - u_slope) * start + (l_icept - u_icept)
+    gap_end = (l_slope - u_slope) * end + (l_icept - u_icept)
+    narrowing = u_slope - l_slope  # gap shrink per pixel of x
+    
+    # Flat sides (resistance/support) must be about as long as the stretch
+    overlap = end - start
+    u_fits = (np.abs(u_slope) > flat_slope) | (u_right - u_left <= FLAT_SIDE_SLACK * overlap)
+    l_fits = (np.abs(l_slope) > flat_slope) | (l_right - l_left <= FLAT_SIDE_SLACK * overlap)
+    
+    converging = (
+        (overlap >= PATTERN_MIN_OVERLAP)
+        & u_fits
+        & l_fits
+        & (gap_end > 0)
+        & (gap_start > gap_end)
+        # Apex (gap_end / narrowing px past the overlap) lands inside the chart
+        & (gap_end <= (width - end) * narrowing)
+    )
+    sides = np.union1d(upper_index[converging.any(axis=1)], lower_index[converging.any(axis=0)])
+    return len(sides)
+
+def _channel_sides(segments, horizontal_mask, vertical_mask):
+    """Count segments that form a closed rectangle/channel.
+    
+    segments is an (n, 4) x1, y1, x2, y2 array; the masks select the
+    horizontal and vertical candidates. Two
+    horizontal bounds must share a stretch of the chart, and vertical sides
+    spanning the gap between them must close it at both ends of that stretch.
+    """
+    horizontal = segments[_longest_indices(segments, horizontal_mask, MAX_PATTERN_SEGMENTS)]
+    vertical = segments[_longest_indices(segments, vertical_mask, MAX_PATTERN_SEGMENTS)]
+    if len(horizontal) < 2 or len(vertical) < 2:
+        return 0
+    
+    hx1, hy1, hx2, hy2 = horizontal.T
+    h_left, h_right, h_y = np.minimum(hx1, hx2), np.maximum(hx1, hx2), (hy1 + hy2) / 2
+    vx1, vy1, vx2, vy2 = vertical.T
+    v_x, v_top, v_bottom = (vx1 + vx2) / 2, np.minimum(vy1, vy2), np.maximum(vy1, vy2)
+    
+    # Bound pairs (upper triangle only): shared x stretch and vertical gap
+    left = np.maximum(h_left[:, None], h_left[None, :])
+    right = np.minimum(h_right[:, None], h_right[None, :])
+    top = np.minimum(h_y[:, None], h_y[None, :])
+    bottom = np.maximum(h_y[:, None], h_y[None, :])
+    pairs = np.triu(
+        (right - left >= PATTERN_MIN_OVERLAP) & (bottom - top > 2 * RECTANGLE_EDGE_SLACK), k=1
+    )
+    
+    # (pair, pair, vertical): the side lies within the stretch and spans the gap
+    slack = RECTANGLE_EDGE_SLACK
+    spans = (
+        (v_x >= left[..., None] - slack) & (v_x <= right[..., None] + slack)
+        & (v_top <= top[..., None] + slack) & (v_bottom >= bottom[..., None] - slack)
+    )
+    
+    # Closed at both ends: spanning sides at least a stretch apart
+    side_left = np.where(spans, v_x, np.inf).min(axis=2)
+    side_right = np.where(spans, v_x, -np.inf).max(axis=2)
+    closed = pairs & (side_right - side_left >= PATTERN_MIN_OVERLAP)
+    if not closed.any():
+        return 0
+    
+    n_bounds = np.count_nonzero(closed.any(axis=1) | closed.any(axis=0))
+    n_sides = np.count_nonzero(spans[closed].any(axis=0))
+    return int(n_bounds + n_sides)
+
 class ChartAnalyzer:
     def __init__(self):
         self.patterns = {
@@ -16,57 +254,82 @@ class ChartAnalyzer:
             "candlestick_patterns": [],
             "indicators": []
         }
+        
+        # Horizontal-line kernel, calibrated for ANALYSIS_WIDTH
+        self._hkernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
     
     def analyze_uploaded_chart(self, uploaded_file):
         """Main function to analyze uploaded chart image."""
         if uploaded_file is not None:
-            # Load and process image
-            image = Image.open(uploaded_file)
+            raw = uploaded_file.getvalue()
             
             # Display original image
-            st.image(image, caption="Uploaded Chart", use_container_width=True)
-            
-            # Convert to array for processing
-            img_array = np.array(image)
+            st.image(raw, caption="Uploaded Chart", use_container_width=True)
             
-            # Perform analysis
-            analysis_results = self.perform_chart_analysis(img_array, image)
-            
-            return analysis_results
+            # Perform analysis (reruns and re-uploads of the same image hit the cache)
+            digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+            return _analyze_cached(digest, raw, self)
         return None
     
-    def perform_chart_analysis(self, img_array, original_image):
+    def analyze_bytes(self, raw):
+        """Analyze a chart from its encoded image bytes, without displaying it."""
+        try:
+            img_array = self.decode_image(raw)
+        except Exception as e:
+            # Truncated or mislabelled uploads fail like any other analysis
+            return self._analysis_failed(_default_results(), e)
+        return self.perform_chart_analysis(img_array)
+    
+    def decode_image(self, raw):
+        """Decode encoded chart bytes to an RGB array with OpenCV."""
+        # Only the header is parsed here; it picks the largest reduced JPEG
+        # decode that still leaves at least ANALYSIS_WIDTH pixels of width
+        with Image.open(BytesIO(raw), formats=CHART_FORMATS) as header:
+            is_jpeg = header.format == "JPEG"
+            width = header.width
+        
+        flags = cv2.IMREAD_COLOR
+        if is_jpeg:
+            for factor, reduced in JPEG_REDUCED_DECODES:
+                if width // factor >= ANALYSIS_WIDTH:
+                    flags = reduced
+                    break
+        
+        img_bgr = cv2.imdecode(np.frombuffer(raw, np.uint8), flags)
+        if img_bgr is None:
+            raise ValueError("Unable to decode chart image")
+        return cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+    
+    def perform_chart_analysis(self, img_array, original_image=None):
         """Analyze the chart image for trading signals."""
         
         # Initialize results
-        results = {
-            "overall_signal": "HOLD",
-            "confidence": 0,
-            "trend_direction": "NEUTRAL",
-            "support_resistance": [],
-            "patterns_detected": [],
-            "technical_analysis": {},
-            "recommendation": ""
-        }
+        results = _default_results()
         
         try:
-            # Convert to grayscale for analysis
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+            # Downscale once and derive grayscale, edges and projections
+            features = self._preprocess(img_array)
             
-            # Detect edges (price movements, trend lines)
-            edges = cv2.Canny(gray, 50, 150)
+            if features is None:
+                results["recommendation"] = "Not enough detail to analyze. Please upload a clearer chart."
+                return results
             
             # Analyze price movement direction
-            trend_analysis = self.analyze_trend_direction(gray)
-            results["trend_direction"] = trend_analysis["direction"]
+            trend_analysis = self.analyze_trend_direction(features)
+            results["trend"] = trend_analysis["direction"]
+            results["trend_direction"] = trend_analysis["direction"].name
             results["confidence"] = trend_analysis["confidence"]
             
             # Detect chart patterns
-            patterns = self.detect_chart_patterns(gray, edges)
-            results["patterns_detected"] = patterns
+            pattern_flags, segment_counts = self.detect_chart_patterns(features)
+            results["pattern_flags"] = pattern_flags
+            results["patterns_detected"] = [
+                f"{name} (x{segment_counts[flag]})" if flag in segment_counts else name
+                for flag, name in _PATTERN_NAMES.items() if pattern_flags & flag
+            ]
             
             # Analyze support/resistance levels
-            support_resistance = self.find_support_resistance_levels(gray)
+            support_resistance = self.find_support_resistance_levels(features)
             results["support_resistance"] = support_resistance
             
             # Generate overall trading signal
@@ -77,93 +340,156 @@ class ChartAnalyzer:
             results["technical_analysis"] = self.generate_technical_insights(results)
             
         except Exception as e:
-            st.error(f"Error analyzing chart: {str(e)}")
-            results["recommendation"] = "Unable to analyze chart. Please try a clearer image."
+            return self._analysis_failed(results, e)
         
         return results
     
-    def analyze_trend_direction(self, gray_image):
+    def _analysis_failed(self, results, error):
+        """Report an analysis error and mark the results as unusable."""
+        st.error(f"Error analyzing chart: {str(error)}")
+        results["recommendation"] = "Unable to analyze chart. Please try a clearer image."
+        return results
+    
+    def _preprocess(self, img_array):
+        """Downscale the chart and compute the arrays shared by every analysis step.
+        
+        Returns None for tiny or near-uniform images, before edge detection runs.
+        """
+        height, width = img_array.shape[:2]
+        if height * width < MIN_CHART_PIXELS:
+            return None
+        scale = ANALYSIS_WIDTH / width
+        
+        # Run the image pipeline on a UMat so OpenCV's T-API can keep the
+        # intermediates on an OpenCL device (or its SIMD CPU path)
+        frame = cv2.UMat(img_array)
+        if scale < 1:
+            frame = cv2.resize(
+                frame,
+                (max(1, round(width * scale)), max(1, round(height * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+        
+        # Convert to grayscale for analysis
+        gray_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        
+        # Cheap gate: blank/placeholder images skip the rest of the pipeline
+        # (the UMat overload returns UMat outputs, so fetch the 1x1 stddev)
+        if cv2.meanStdDev(gray_frame)[1].get()[0, 0] < MIN_GRAY_STD:
+            return None
+        
+        # Detect edges (price movements, trend lines)
+        edges_frame = cv2.Canny(gray_frame, 50, 150)
+        
+        # Find horizontal lines (support/resistance) and their strength
+        horizontal_lines = cv2.morphologyEx(edges_frame, cv2.MORPH_OPEN, self._hkernel)
+        horizontal_strength = cv2.countNonZero(horizontal_lines)
+        
+        # Horizontal projection (row sums) with an int32 SIMD accumulator
+        row_sum = cv2.reduce(gray_frame, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S)
+        
+        # Host copies for the numpy-side analysis
+        gray = gray_frame.get()
+        edges = edges_frame.get()
+        
+        # Brightest pixels on the right side of the chart (recent prices)
+        recent_region = gray[:, int(gray.shape[1]*0.7):]
+        
+        # 85th-percentile brightness from a 256-bin histogram instead of a sort
+        hist = cv2.calcHist([recent_region], [0], None, [256], [0, 256]).ravel()
+        bright_threshold = np.searchsorted(hist.cumsum(), 0.85 * recent_region.size)
+        bright_mask = recent_region > bright_threshold
+        
+        return {
+            "gray": gray,
+            "edges": edges,
+            "horizontal_strength": horizontal_strength,
+            "row_sum": row_sum.get().ravel(),
+            "bright_mask": bright_mask,
+            "shape": gray.shape
+        }
+    
+    def analyze_trend_direction(self, features):
         """Analyze overall trend direction from the chart."""
-        height, width = gray_image.shape
+        # Slope of the bright pixels (likely price line/candles) in the recent region
+        slope = _mask_slope(features["bright_mask"])
         
-        # Sample price points from right side of chart (recent prices)
-        recent_region = gray_image[:, int(width*0.7):]
+        if slope is not None:
+            # Determine trend (negative slope = uptrend in image coordinates)
+            if slope < -2:
+                return {"direction": Trend.STRONG_UPTREND, "confidence": 80}
+            elif slope < -0.5:
+                return {"direction": Trend.UPTREND, "confidence": 65}
+            elif slope > 2:
+                return {"direction": Trend.STRONG_DOWNTREND, "confidence": 80}
+            elif slope > 0.5:
+                return {"direction": Trend.DOWNTREND, "confidence": 65}
+            else:
+                return {"direction": Trend.SIDEWAYS, "confidence": 50}
+        
+        return {"direction": Trend.NEUTRAL, "confidence": 30}
+    
+    def detect_chart_patterns(self, features):
+        """Detect common chart patterns as PatternFlags plus supporting segment counts."""
+        edges = features["edges"]
+        patterns = PatternFlags.NONE
+        segment_counts = {}
         
-        # Find the brightest pixels (likely price line/candles)
-        bright_threshold = np.percentile(recent_region, 85)
-        bright_pixels = np.where(recent_region > bright_threshold)
+        # Horizontal line strength (support/resistance)
+        if features["horizontal_strength"] > 100:
+            patterns |= PatternFlags.SUPPORT_RESISTANCE
         
-        if len(bright_pixels[0]) > 10:
-            # Calculate slope of recent price movement
-            y_coords = bright_pixels[0]
-            x_coords = bright_pixels[1]
+        # Detect triangular/rectangular patterns from line segments
+        lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=80, minLineLength=40, maxLineGap=5)
+        
+        if lines is not None:
+            # Segment orientation in degrees, 0-180 (image y axis points down)
+            segments = lines.reshape(-1, 4).astype(np.float64)
+            x1, y1, x2, y2 = segments.T
+            angles = np.degrees(np.arctan2(y2 - y1, x2 - x1)) % 180
             
-            # Fit line to recent price points
-            if len(y_coords) > 1:
-                slope = np.polyfit(x_coords, y_coords, 1)[0]
-                
-                # Determine trend (negative slope = uptrend in image coordinates)
-                if slope < -2:
-                    return {"direction": "STRONG_UPTREND", "confidence": 80}
-                elif slope < -0.5:
-                    return {"direction": "UPTREND", "confidence": 65}
-                elif slope > 2:
-                    return {"direction": "STRONG_DOWNTREND", "confidence": 80}
-                elif slope > 0.5:
-                    return {"direction": "DOWNTREND", "confidence": 65}
-                else:
-                    return {"direction": "SIDEWAYS", "confidence": 50}
-        
-        return {"direction": "NEUTRAL", "confidence": 30}
-    
-    def detect_chart_patterns(self, gray_image, edges):
-        """Detect common chart patterns."""
-        patterns = []
-        
-        # Find horizontal lines (support/resistance)
-        horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-        horizontal_lines = cv2.morphologyEx(edges, cv2.MORPH_OPEN, horizontal_kernel)
-        
-        # Count horizontal line strength
-        horizontal_strength = np.sum(horizontal_lines > 0)
-        
-        if horizontal_strength > 100:
-            patterns.append("Strong Support/Resistance Levels")
-        
-        # Detect triangular patterns (simplified)
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        for contour in contours:
-            if len(contour) > 10:
-                # Approximate contour to polygon
-                epsilon = 0.02 * cv2.arcLength(contour, True)
-                approx = cv2.approxPolyDP(contour, epsilon, True)
-                
-                if len(approx) == 3:
-                    patterns.append("Triangle Pattern")
-                elif len(approx) == 4:
-                    patterns.append("Rectangle/Channel Pattern")
-        
-        return patterns[:5]  # Return top 5 patterns
+            # Plot frame, axis, gridline and price-line segments are not patterns
+            height, width = features["shape"]
+            frame = (
+                (np.abs(x2 - x1) > FRAME_SPAN_FRACTION * width)
+                | (np.abs(y2 - y1) > FRAME_SPAN_FRACTION * height)
+            )
+            
+            horizontal = ~frame & ((angles < LINE_ANGLE_TOLERANCE) | (angles > 180 - LINE_ANGLE_TOLERANCE))
+            vertical = ~frame & (np.abs(angles - 90) < LINE_ANGLE_TOLERANCE)
+            diagonal = ~frame & ~(horizontal | vertical)
+            rising = diagonal & (angles > 90)
+            falling = diagonal & (angles < 90)
+            
+            # A falling or flat upper side converging with a rising or flat
+            # lower side: symmetrical, descending and ascending triangles
+            n_sides = _converging_sides(segments, falling | horizontal, rising | horizontal, width)
+            if n_sides:
+                patterns |= PatternFlags.TRIANGLE
+                segment_counts[PatternFlags.TRIANGLE] = n_sides
+            
+            # Two overlapping horizontal bounds closed by vertical sides
+            n_sides = _channel_sides(segments, horizontal, vertical)
+            if n_sides:
+                patterns |= PatternFlags.RECTANGLE
+                segment_counts[PatternFlags.RECTANGLE] = n_sides
+        
+        return patterns, segment_counts
     
-    def find_support_resistance_levels(self, gray_image):
+    def find_support_resistance_levels(self, features):
         """Find horizontal support and resistance levels."""
-        height, width = gray_image.shape
+        height, width = features["shape"]
         
         # Look for horizontal lines in price area
-        horizontal_projection = np.sum(gray_image, axis=1)
-        
-        # Find peaks (potential support/resistance)
-        from scipy.signal import find_peaks
-        peaks, _ = find_peaks(horizontal_projection, height=np.max(horizontal_projection)*0.3)
+        horizontal_projection = features["row_sum"]
         
-        levels = []
-        for peak in peaks[:5]:  # Top 5 levels
-            strength = horizontal_projection[peak]
-            price_level = f"Level at {peak/height*100:.1f}% of chart height"
-            levels.append({"level": price_level, "strength": int(strength)})
+        # Find the 5 strongest peaks (potential support/resistance)
+        peaks, strengths = _strongest_peaks(horizontal_projection, 5)
         
-        return levels
+        return [
+            {"level": f"Level at {peak/height*100:.1f}% of chart height", "strength": int(strength)}
+            for peak, strength in zip(peaks, strengths)
+        ]
     
     def generate_trading_signal(self, analysis_results):
         """Generate overall buy/sell signal based on analysis."""
@@ -171,31 +497,17 @@ class ChartAnalyzer:
         reasoning = []
         
         # Trend analysis weight: 40%
-        trend = analysis_results["trend_direction"]
-        if "UPTREND" in trend:
-            if "STRONG" in trend:
-                signal_score += 40
-                reasoning.append("Strong uptrend detected")
-            else:
-                signal_score += 25
-                reasoning.append("Uptrend detected")
-        elif "DOWNTREND" in trend:
-            if "STRONG" in trend:
-                signal_score -= 40
-                reasoning.append("Strong downtrend detected")
-            else:
-                signal_score -= 25
-                reasoning.append("Downtrend detected")
+        trend_score = _TREND_SCORES.get(analysis_results["trend"])
+        if trend_score:
+            signal_score += trend_score[0]
+            reasoning.append(trend_score[1])
         
         # Pattern analysis weight: 30%
-        patterns = analysis_results["patterns_detected"]
-        for pattern in patterns:
-            if "Triangle" in pattern:
-                signal_score += 10
-                reasoning.append("Triangle pattern suggests breakout potential")
-            elif "Support" in pattern:
-                signal_score += 15
-                reasoning.append("Strong support/resistance levels identified")
+        pattern_flags = analysis_results["pattern_flags"]
+        for flag, (score, reason) in _PATTERN_SCORES.items():
+            if pattern_flags & flag:
+                signal_score += score
+                reasoning.append(reason)
         
         # Support/Resistance weight: 30%
         levels = analysis_results["support_resistance"]
@@ -204,21 +516,8 @@ class ChartAnalyzer:
             reasoning.append("Multiple support/resistance levels provide structure")
         
         # Determine final signal
-        if signal_score >= 30:
-            overall_signal = "STRONG BUY"
-            confidence = min(90, 60 + signal_score)
-        elif signal_score >= 15:
-            overall_signal = "BUY"
-            confidence = min(75, 50 + signal_score)
-        elif signal_score <= -30:
-            overall_signal = "STRONG SELL"
-            confidence = min(90, 60 + abs(signal_score))
-        elif signal_score <= -15:
-            overall_signal = "SELL"
-            confidence = min(75, 50 + abs(signal_score))
-        else:
-            overall_signal = "HOLD"
-            confidence = 40 + abs(signal_score)
+        overall_signal, base, cap = _SIGNAL_BANDS[bisect_right(_SIGNAL_CUTOFFS, signal_score)]
+        confidence = min(cap, base + abs(signal_score))
         
         recommendation = f"Based on technical analysis: {' | '.join(reasoning)}"
         
@@ -234,18 +533,17 @@ class ChartAnalyzer:
         insights = {}
         
         # Trend insights
-        trend = results["trend_direction"]
-        if "UPTREND" in trend:
+        trend = results["trend"]
+        if trend >= Trend.UPTREND:
             insights["trend_analysis"] = "Bullish momentum detected. Consider long positions."
-        elif "DOWNTREND" in trend:
+        elif trend <= Trend.DOWNTREND:
             insights["trend_analysis"] = "Bearish pressure evident. Consider short positions or exit longs."
         else:
             insights["trend_analysis"] = "Market consolidating. Wait for clear directional break."
         
         # Pattern insights
-        patterns = results["patterns_detected"]
-        if patterns:
-            insights["pattern_analysis"] = f"Key patterns: {', '.join(patterns)}. Monitor for breakouts."
+        if results["pattern_flags"]:
+            insights["pattern_analysis"] = f"Key patterns: {', '.join(results['patterns_detected'])}. Monitor for breakouts."
         else:
             insights["pattern_analysis"] = "No clear patterns detected. Market may be in transition."
         
@@ -258,15 +556,7 @@ class ChartAnalyzer:
         
         return insights
 
-# Add scipy to requirements if not present
-try:
-    from scipy.signal import find_peaks
-except ImportError:
-    def find_peaks(data, height=None):
-        """Simple peak detection fallback."""
-        peaks = []
-        for i in range(1, len(data)-1):
-            if data[i] > data[i-1] and data[i] > data[i+1]:
-                if height is None or data[i] >= height:
-                    peaks.append(i)
-        return peaks, {}
+@st.cache_data(max_entries=64, show_spinner=False)
+def _analyze_cached(digest, _raw, _analyzer):
+    """Analyze encoded chart bytes, memoized on their content digest."""
+    return _analyzer.analyze_bytes(_raw)
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("yfinance")
+pytest.importorskip("plotly")
+
+import app
+
+# Payload in the v8 spark layout for ?symbols=AAPL,ZZZZ (ZZZZ has no bars)
+SPARK_PAYLOAD = {
+    "AAPL": {
+        "symbol": "AAPL",
+        "previousClose": None,
+        "chartPreviousClose": 227.48,
+        "timestamp": [1718026200, 1718029800, 1718033400],
+        "close": [226.31, None, 228.05],
+        "end": None,
+        "start": None,
+        "dataGranularity": 300
+    },
+    "ZZZZ": {
+        "symbol": "ZZZZ",
+        "previousClose": None,
+        "chartPreviousClose": None,
+        "end": None,
+        "start": None,
+        "dataGranularity": 300
+    }
+}
+
+
+def test_parse_spark_reads_flat_v8_map():
+    closes = app.parse_spark(SPARK_PAYLOAD)
+
+    assert list(closes) == ["AAPL"]
+    series = closes["AAPL"]
+    assert series.index[0].value // 10**9 == 1718026200
+    assert series.iloc[0] == 226.31
+    assert series.isna().iloc[1]
+    assert series.iloc[-1] == 228.05